@@ -0,0 +1,183 @@
+"""Headless JSON API serving the dashboard's KPI, risk distribution and review metrics.
+
+The app is a plain ASGI callable built on aml_data's cached aggregates, so polling it
+never triggers a Streamlit rerun. Run it standalone with
+
+    uvicorn aml_api:app --port 8502
+
+or set AML_API_PORT and appv9.py starts it inside the Streamlit process, where it
+shares the same in-memory caches as the dashboard. When several Streamlit workers
+run on one node, only the first to bind the port serves the API; the others report
+the port as taken and carry on. With AML_SNAPSHOT_DIR set every worker reads the
+same snapshot, so whichever one serves returns the numbers the dashboards show.
+
+Endpoints:
+    GET /health
+    GET /periods
+    GET /metrics?year=2025&month=5[&countries=India,UK][&industries=Defence][&active_only=false]
+
+Responses carry a strong ETag and honour If-None-Match with 304 Not Modified.
+"""
+import asyncio
+import hashlib
+import json
+import socket
+import threading
+from urllib.parse import parse_qs
+
+import aml_data
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+FALSE_VALUES = {"0", "false", "no", "off"}
+
+
+class BadRequest(Exception):
+    """Raised for malformed query parameters; rendered as a 400 response"""
+
+
+def _list_param(params, name):
+    if name not in params:
+        return None
+    return [item.strip() for value in params[name] for item in value.split(",") if item.strip()]
+
+
+def _int_param(params, name):
+    if name not in params:
+        raise BadRequest(f"missing required parameter '{name}'")
+    try:
+        return int(params[name][-1])
+    except ValueError:
+        raise BadRequest(f"parameter '{name}' must be an integer")
+
+
+def _bool_param(params, name, default):
+    if name not in params:
+        return default
+    value = params[name][-1].lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise BadRequest(f"parameter '{name}' must be a boolean")
+
+
+def metrics_payload(query_string):
+    """Resolve a /metrics query string into its metrics dict, or None for an unknown period"""
+    params = parse_qs(query_string)
+    year = _int_param(params, "year")
+    month = _int_param(params, "month")
+    if (year, month) not in aml_data.available_periods():
+        return None
+    return aml_data.compute_metrics(
+        year,
+        month,
+        countries=_list_param(params, "countries"),
+        industries=_list_param(params, "industries"),
+        active_only=_bool_param(params, "active_only", True),
+    )
+
+
+def _encode(payload):
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return body, etag
+
+
+def _etag_matches(if_none_match, etag):
+    if if_none_match is None:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _route(method, path, query_string):
+    """Return (status, payload) for a request"""
+    if method not in ("GET", "HEAD"):
+        return 405, {"error": "method not allowed"}
+    if path == "/health":
+        return 200, {"status": "ok"}
+    if path == "/periods":
+        return 200, {"periods": [{"year": year, "month": month} for year, month in aml_data.available_periods()]}
+    if path == "/metrics":
+        try:
+            payload = metrics_payload(query_string)
+        except BadRequest as exc:
+            return 400, {"error": str(exc)}
+        if payload is None:
+            return 404, {"error": "no data for the requested period"}
+        return 200, payload
+    return 404, {"error": "not found"}
+
+
+def _header(scope, name):
+    for key, value in scope.get("headers", []):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _send(send, status, headers, body):
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _respond(method, path, query_string):
+    """Route and encode a request; runs off the event loop since cache misses hit pandas"""
+    status, payload = _route(method, path, query_string)
+    body, etag = _encode(payload)
+    return status, body, etag
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await asyncio.to_thread(aml_data.load_all_data)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    method = scope["method"]
+    status, body, etag = await asyncio.to_thread(
+        _respond, method, scope["path"], scope.get("query_string", b"").decode("latin-1")
+    )
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"etag", etag.encode("ascii")),
+        (b"cache-control", b"no-cache"),
+    ]
+    if status == 200 and _etag_matches(_header(scope, b"if-none-match"), etag):
+        await _send(send, 304, headers, b"")
+        return
+    headers.append((b"content-length", str(len(body)).encode("ascii")))
+    await _send(send, status, headers, b"" if method == "HEAD" else body)
+
+
+def serve_in_background(port, host="0.0.0.0"):
+    """Start the API on a daemon thread in the current process (requires uvicorn).
+
+    The port is bound and put into listening state here rather than inside uvicorn's
+    thread, so a port already held by another worker is detected up front: nothing is
+    started and None is returned. Listening inside the same guard matters because two
+    SO_REUSEADDR sockets may both bind a port that nobody is listening on yet.
+    """
+    import uvicorn
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.bind((host, port))
+        sock.listen()
+    except OSError:
+        sock.close()
+        return None
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, name="aml-metrics-api", daemon=True)
+    thread.start()
+    return server
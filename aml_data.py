@@ -0,0 +1,283 @@
+"""Data generation and cached aggregates shared by the dashboard and the metrics API.
+
+Nothing in here imports Streamlit, so headless consumers (see aml_api.py) can reuse
+the exact numbers shown on the dashboard without triggering script reruns.
+"""
+import os
+import random
+from datetime import date, datetime, timedelta
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import aml_snapshot
+
+SNAPSHOT_DIR = os.environ.get("AML_SNAPSHOT_DIR")
+GENERATED_VERSION = "generated"
+
+RISK_CATEGORIES = ["High", "Medium", "Low"]
+INACTIVE_STATUSES = ["NCC", "Suspended", "Withdrawn"]
+
+DatasetSummary = namedtuple("DatasetSummary", ["periods", "countries", "industries"])
+
+# ----------------- Data Generation Functions -----------------
+def calculate_next_review_date(last_review_date, risk_category):
+    """Calculate next review date based on risk category"""
+    if risk_category == "High":
+        return last_review_date + timedelta(days=365)
+    elif risk_category == "Medium":
+        return last_review_date + timedelta(days=1095)
+    else:
+        return last_review_date + timedelta(days=1825)
+
+def generate_enhanced_mock_data(month, year):
+    """Generate comprehensive mock data"""
+    np.random.seed(year + month)
+    random.seed(year + month)
+    
+    client_count = 27
+    countries = ["India", "Mauritius", "Singapore", "UAE", "UK", "Panama", "Qatar", "China", "USA", "Switzerland"]
+    industries = ["Defence", "Material", "Co-operative", "Banking", "Trading", "Real Estate", "Financial Services", "IT Services"]
+    
+    # Create structured data based on report
+    client_data = []
+    
+    # High Risk: 11 clients (5 Defence + 6 Material)
+    for i in range(11):
+        subcat = "Defence" if i < 5 else "Material"
+        is_new = i < 5  # 5 new high risk clients
+        client_data.append({
+            "Risk_Category": "High",
+            "Subcategory": subcat,
+            "Is_New": is_new
+        })
+    
+    # Medium Risk: 11 clients (3 Co-operative + 8 Material)  
+    for i in range(11):
+        subcat = "Co-operative" if i < 3 else "Material"
+        is_new = i < 1  # 1 new medium risk
+        client_data.append({
+            "Risk_Category": "Medium",
+            "Subcategory": subcat,
+            "Is_New": is_new
+        })
+    
+    # Low Risk: 5 clients
+    for i in range(5):
+        client_data.append({
+            "Risk_Category": "Low",
+            "Subcategory": "Low Risk",
+            "Is_New": False
+        })
+    
+    # Generate DataFrame
+    base_date = datetime(year, month, 1)
+    data_rows = []
+    
+    for i, client_info in enumerate(client_data):
+        if client_info["Is_New"]:
+            days_back = random.randint(1, 30)
+        else:
+            if client_info["Risk_Category"] == "High":
+                days_back = random.randint(30, 365)
+            elif client_info["Risk_Category"] == "Medium":
+                days_back = random.randint(180, 1095)
+            else:
+                days_back = random.randint(365, 1825)
+        
+        review_date = base_date - timedelta(days=days_back)
+        
+        # Status assignment
+        if month == 5 and year == 2025 and i < 3:
+            status = random.choice(["NCC", "Suspended", "Withdrawn"])
+        else:
+            status = "Active"
+        
+        data_rows.append({
+            "Client_ID": f"C{str(i+1).zfill(3)}",
+            "Client_Name": f"Client_{i+1}",
+            "Country": np.random.choice(countries),
+            "Industry": client_info["Subcategory"],
+            "Risk_Category": client_info["Risk_Category"],
+            "Subcategory": client_info["Subcategory"],
+            "Last_Reviewed": review_date,
+            "Status": status,
+            "Is_New_Client": client_info["Is_New"],
+            "GST_PAN_Verified": random.choice([True, False]) if client_info["Is_New"] else True,
+            "Sanctions_Checked": True,
+            "Dow_Jones_Alert": False,
+            "Month": month,
+            "Year": year,
+            "Business_Vertical": random.choice(["Ratings", "Research", "Advisory", "Risk Solutions"]),
+            "AUM_Million_USD": random.randint(10, 500),
+            "Last_Transaction_Date": review_date + timedelta(days=random.randint(1, 30))
+        })
+    
+    df = pd.DataFrame(data_rows)
+    df["Next_Review"] = df.apply(
+        lambda row: calculate_next_review_date(row["Last_Reviewed"], row["Risk_Category"]), 
+        axis=1
+    )
+    
+    current_date = datetime.now()
+    df["Days_Until_Review"] = (df["Next_Review"] - current_date).dt.days
+    
+    return df
+
+# ----------------- Load Data -----------------
+def build_all_data():
+    data_may_2025 = generate_enhanced_mock_data(5, 2025)
+    data_apr_2025 = generate_enhanced_mock_data(4, 2025) 
+    data_may_2024 = generate_enhanced_mock_data(5, 2024)
+    return pd.concat([data_may_2025, data_apr_2025, data_may_2024])
+
+def data_version():
+    """Live dataset version: the current snapshot under AML_SNAPSHOT_DIR, else in-process generation"""
+    if SNAPSHOT_DIR:
+        return aml_snapshot.current_version(SNAPSHOT_DIR)
+    return GENERATED_VERSION
+
+@lru_cache(maxsize=2)
+def _load_source(version):
+    # Two slots keep the outgoing version mapped while readers move over to a new one
+    if version == GENERATED_VERSION:
+        return aml_snapshot.Snapshot(version, build_all_data(), None)
+    return aml_snapshot.load_snapshot(SNAPSHOT_DIR, version)
+
+@lru_cache(maxsize=2)
+def _load_dataset(version, day):
+    """Dataset for a version with Days_Until_Review derived as of `day`.
+
+    `day` only keys the cache, so the column is rebuilt on the first access each day.
+    The shallow copy shares every source column (including memory-mapped ones) and
+    only adds the derived column.
+    """
+    source = _load_source(version)
+    frame = source.frame.copy(deep=False)
+    frame["Days_Until_Review"] = (frame["Next_Review"] - datetime.now()).dt.days
+    return source._replace(frame=frame)
+
+def load_dataset():
+    """Live dataset as a Snapshot (version, frame, period_index); the frame is read-only"""
+    return _load_dataset(data_version(), date.today())
+
+def load_all_data():
+    """Process-wide dataset; callers must treat the returned frame as read-only"""
+    return load_dataset().frame
+
+def period_rows(all_data, year, month, period_index=None):
+    """Rows for one reporting period, sliced via the dataset's period index when one is given"""
+    if period_index is not None:
+        start, stop = period_index.get((year, month), (0, 0))
+        return all_data.iloc[start:stop]
+    return all_data[(all_data["Year"] == year) & (all_data["Month"] == month)]
+
+@lru_cache(maxsize=2)
+def dataset_summary(version):
+    """Periods and distinct filter values of a dataset version, scanned once per version"""
+    all_data = _load_source(version).frame
+    periods = all_data[["Year", "Month"]].drop_duplicates()
+    return DatasetSummary(
+        periods=tuple(sorted((int(year), int(month)) for year, month in periods.itertuples(index=False))),
+        countries=tuple(sorted(all_data["Country"].unique())),
+        industries=tuple(sorted(all_data["Industry"].unique()))
+    )
+
+@lru_cache(maxsize=2)
+def risk_trend(version):
+    """Client counts per monthly snapshot and risk category, aggregated once per version"""
+    counts = (
+        _load_source(version).frame
+        .groupby(["Year", "Month", "Risk_Category"], observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
+    counts["Snapshot_Date"] = pd.to_datetime(dict(year=counts["Year"], month=counts["Month"], day=1))
+    return counts
+
+def available_periods():
+    """Sorted (year, month) pairs present in the dataset"""
+    return dataset_summary(data_version()).periods
+
+# ----------------- Filtering -----------------
+def filter_data(all_data, year, month, countries, industries, active_only=True, period_index=None):
+    """Apply the dashboard's period, country, industry and status filters"""
+    period_data = period_rows(all_data, year, month, period_index)
+    filtered = period_data[
+        (period_data["Country"].isin(countries)) &
+        (period_data["Industry"].isin(industries))
+    ]
+    if active_only:
+        filtered = filtered[filtered["Status"] == "Active"]
+    return filtered
+
+# ----------------- Aggregates -----------------
+def kpi_metrics(all_data, filtered_data, year, month, period_index=None):
+    """Numbers behind the Key Performance Indicator cards"""
+    period_data = period_rows(all_data, year, month, period_index)
+    return {
+        "total_clients": len(filtered_data),
+        "new_clients": int(filtered_data["Is_New_Client"].sum()),
+        "high_risk": int((filtered_data["Risk_Category"] == "High").sum()),
+        "pending_reviews": int((filtered_data["Days_Until_Review"] <= 30).sum()),
+        "ncc_clients": int(period_data["Status"].isin(INACTIVE_STATUSES).sum()),
+    }
+
+def risk_distribution(period_data):
+    """Rows of the Risk Distribution Table: new/existing counts per risk category and subcategory"""
+    rows = []
+    for risk in RISK_CATEGORIES:
+        risk_clients = period_data[period_data["Risk_Category"] == risk]
+        for subcat in risk_clients["Subcategory"].unique():
+            subcat_clients = risk_clients[risk_clients["Subcategory"] == subcat]
+            new_count = int(subcat_clients["Is_New_Client"].sum())
+            existing_count = len(subcat_clients) - new_count
+            rows.append({
+                "risk_category": risk,
+                "subcategory": subcat,
+                "new": new_count,
+                "existing": existing_count,
+                "total": new_count + existing_count
+            })
+    return rows
+
+def review_buckets(filtered_data):
+    """Client counts per review urgency bucket"""
+    days = filtered_data["Days_Until_Review"]
+    return {
+        "overdue": int((days < 0).sum()),
+        "due_30_days": int(((days >= 0) & (days <= 30)).sum()),
+        "due_90_days": int(((days > 30) & (days <= 90)).sum()),
+        "scheduled": int((days > 90).sum()),
+    }
+
+def compute_metrics(year, month, countries=None, industries=None, active_only=True):
+    """KPI, risk distribution and review bucket metrics for one period and filter set.
+
+    None for countries/industries means no filter. Selections are normalised before
+    hitting the cache so the dashboard and API share entries for the same view.
+    The returned dict is shared between callers and must not be mutated.
+    """
+    version = data_version()
+    summary = dataset_summary(version)
+    countries = summary.countries if countries is None else tuple(sorted(countries))
+    industries = summary.industries if industries is None else tuple(sorted(industries))
+    return _compute_metrics(version, date.today(), int(year), int(month), countries, industries, bool(active_only))
+
+@lru_cache(maxsize=256)
+def _compute_metrics(version, day, year, month, countries, industries, active_only):
+    dataset = _load_dataset(version, day)
+    all_data, period_index = dataset.frame, dataset.period_index
+    filtered_data = filter_data(all_data, year, month, countries, industries, active_only, period_index)
+    period_data = period_rows(all_data, year, month, period_index)
+    return {
+        "data_version": version,
+        "as_of": day.isoformat(),
+        "period": {"year": year, "month": month},
+        "filters": {"countries": list(countries), "industries": list(industries), "active_only": active_only},
+        "kpis": kpi_metrics(all_data, filtered_data, year, month, period_index),
+        "risk_distribution": risk_distribution(period_data),
+        "review_buckets": review_buckets(filtered_data),
+    }
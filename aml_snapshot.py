@@ -0,0 +1,165 @@
+"""Memory-mapped dataset snapshots shared read-only by every worker process on a node.
+
+Layout under a snapshot root:
+
+    CURRENT                        name of the live version, swapped atomically
+    <version>/manifest.json        column kinds, string categories and row count
+    <version>/<column>.npy         one array per column (strings stored as category codes)
+    <version>/period_index.npy     (year, month, start, stop) for the period-sorted rows
+
+Workers open the arrays with mmap_mode="r", so the page cache holds one copy of every
+column however many Streamlit processes run on the node. String columns load as
+pandas categoricals whose codes are the mapped arrays themselves; only the small
+list of distinct values is materialised per process. Publish a new snapshot with
+
+    python aml_snapshot.py build /var/lib/aml/snapshots
+
+and point every worker at the root through AML_SNAPSHOT_DIR.
+"""
+import argparse
+import json
+import os
+import shutil
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+PERIOD_INDEX_FILE = "period_index.npy"
+STAGING_PREFIX = ".staging-"
+DEFAULT_KEEP_VERSIONS = 3
+
+Snapshot = namedtuple("Snapshot", ["version", "frame", "period_index"])
+
+
+def current_version(root):
+    """Name of the live snapshot version under root"""
+    path = Path(root) / CURRENT_FILE
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"No snapshot published in {root}; run `python aml_snapshot.py build {root}` first"
+        ) from None
+
+
+def write_snapshot(df, root, keep=DEFAULT_KEEP_VERSIONS):
+    """Persist df as a new snapshot version, make it current and prune old versions"""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    staging = root / f"{STAGING_PREFIX}{version}"
+    staging.mkdir()
+    try:
+        _write_version(df, staging, version)
+        os.rename(staging, root / version)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    pointer = root / f"{CURRENT_FILE}.{version}.tmp"
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, root / CURRENT_FILE)
+
+    prune_versions(root, keep)
+    return version
+
+
+def _write_version(df, directory, version):
+    """Write the column arrays, period index and manifest for one version into directory"""
+    # Days_Until_Review is relative to today, so readers derive it themselves
+    frame = (
+        df.drop(columns=["Days_Until_Review"], errors="ignore")
+        .sort_values(["Year", "Month"], kind="stable")
+        .reset_index(drop=True)
+    )
+    columns = []
+    for name in frame.columns:
+        values = frame[name]
+        if (
+            pd.api.types.is_object_dtype(values)
+            or pd.api.types.is_string_dtype(values)
+            or isinstance(values.dtype, pd.CategoricalDtype)
+        ):
+            # Keep pandas' own code width so from_codes can wrap the mapped array without a cast
+            categorical = pd.Categorical(values)
+            np.save(directory / f"{name}.npy", categorical.codes)
+            columns.append({"name": name, "kind": "string", "categories": categorical.categories.tolist()})
+        else:
+            np.save(directory / f"{name}.npy", values.to_numpy())
+            columns.append({"name": name, "kind": "array"})
+
+    sizes = frame.groupby(["Year", "Month"], sort=True).size()
+    stops = sizes.cumsum().to_numpy()
+    period_index = np.column_stack([
+        sizes.index.get_level_values("Year"),
+        sizes.index.get_level_values("Month"),
+        stops - sizes.to_numpy(),
+        stops
+    ]).astype(np.int64)
+    np.save(directory / PERIOD_INDEX_FILE, period_index)
+
+    manifest = {"version": version, "rows": len(frame), "columns": columns}
+    (directory / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+
+
+def prune_versions(root, keep=DEFAULT_KEEP_VERSIONS):
+    """Remove all but the newest `keep` versions; workers still mapping one keep their pages"""
+    root = Path(root)
+    live = current_version(root)
+    versions = sorted(
+        path.name for path in root.iterdir()
+        if path.is_dir() and not path.name.startswith(STAGING_PREFIX)
+    )
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != live:
+            shutil.rmtree(root / version, ignore_errors=True)
+
+
+def load_snapshot(root, version=None):
+    """Map a snapshot version (default: current) into a DataFrame plus its period index.
+
+    The frame is backed by read-only mappings and must not be modified in place.
+    """
+    version = version or current_version(root)
+    directory = Path(root) / version
+    manifest = json.loads((directory / MANIFEST_FILE).read_text(encoding="utf-8"))
+
+    data = {}
+    for column in manifest["columns"]:
+        array = np.load(directory / f"{column['name']}.npy", mmap_mode="r")
+        if column["kind"] == "string":
+            array = pd.Categorical.from_codes(array, column["categories"])
+        data[column["name"]] = array
+    frame = pd.DataFrame(data, copy=False)
+
+    period_index = {
+        (int(year), int(month)): (int(start), int(stop))
+        for year, month, start, stop in np.load(directory / PERIOD_INDEX_FILE, mmap_mode="r")
+    }
+    return Snapshot(version, frame, period_index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage memory-mapped AML dashboard snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="generate the dataset and publish it as the current snapshot")
+    build.add_argument("root", help="snapshot root directory shared by the worker processes")
+    build.add_argument("--keep", type=int, default=DEFAULT_KEEP_VERSIONS, help="number of versions to retain")
+    current = commands.add_parser("current", help="print the live snapshot version")
+    current.add_argument("root")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        import aml_data
+        print(write_snapshot(aml_data.build_all_data(), args.root, keep=args.keep))
+    else:
+        print(current_version(args.root))
+
+
+if __name__ == "__main__":
+    main()
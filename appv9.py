@@ -1,11 +1,31 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
+import importlib
+import os
 from datetime import datetime, timedelta
-import random
+from pathlib import Path
+
+import aml_data
+from chart_budget import (
+    MAX_FIGURE_PAYLOAD_KB, bin_timeseries, cap_categories, cap_frame_rows, split_top_categories
+)
+
+# ----------------- Deferred Heavy Imports -----------------
+class LazyModule:
+    """Import a module on first attribute access instead of at script start"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# Streamlit already imports plotly.graph_objects; plotly.express is the part worth deferring
+px = LazyModule("plotly.express")
 
 # ----------------- Page Config -----------------
 st.set_page_config(
@@ -14,214 +34,40 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# ----------------- Custom CSS for Professional Look -----------------
-st.markdown("""
-<style>
-    .main-header {
-        background: linear-gradient(90deg, #1f4e79, #2d5aa0);
-        padding: 1.5rem;
-        border-radius: 10px;
-        color: white;
-        margin-bottom: 2rem;
-        text-align: center;
-    }
-    .metric-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-        border-left: 5px solid #1f4e79;
-        margin-bottom: 1rem;
-        text-align: center;
-        transition: transform 0.3s ease;
-    }
-    .metric-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-    }
-    .metric-number {
-        font-size: 3rem;
-        font-weight: bold;
-        margin: 10px 0;
-    }
-    .metric-label {
-        font-size: 1.1rem;
-        color: #666;
-        margin: 0;
-    }
-    .chart-container {
-        background: white;
-        padding: 1rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        margin-bottom: 2rem;
-    }
-    .executive-summary {
-        background: linear-gradient(135deg, #f8f9fa, #e9ecef);
-        border-radius: 10px;
-        padding: 2rem;
-        border-left: 5px solid #28a745;
-        margin-bottom: 2rem;
-    }
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        justify-content: center;
-    }
-    .stTabs [data-baseweb="tab"] {
-        background: linear-gradient(135deg, #f1f3f4, #e8eaed);
-        border-radius: 20px;
-        padding: 15px 30px;
-        font-weight: bold;
-        font-size: 1.1rem;
-        border: none;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-    }
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #1f4e79, #2d5aa0);
-        color: white !important;
-        box-shadow: 0 4px 15px rgba(31,78,121,0.3);
-    }
-    .alert-box {
-        background: #fff3cd;
-        border: 2px solid #ffc107;
-        border-radius: 10px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    .success-box {
-        background: #d1edff;
-        border: 2px solid #0066cc;
-        border-radius: 10px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    .sidebar .sidebar-content {
-        background: linear-gradient(180deg, #f8f9fa, #e9ecef);
-    }
-</style>
-""", unsafe_allow_html=True)
+# ----------------- Metrics API -----------------
+API_PORT = os.environ.get("AML_API_PORT")
 
-# ----------------- Data Generation Functions -----------------
-def calculate_next_review_date(last_review_date, risk_category):
-    """Calculate next review date based on risk category"""
-    if risk_category == "High":
-        return last_review_date + timedelta(days=365)
-    elif risk_category == "Medium":
-        return last_review_date + timedelta(days=1095)
-    else:
-        return last_review_date + timedelta(days=1825)
+@st.cache_resource
+def start_metrics_api(port):
+    """Serve the metrics API from this process, or return None if another worker holds the port"""
+    import aml_api
+    return aml_api.serve_in_background(port)
 
-def generate_enhanced_mock_data(month, year):
-    """Generate comprehensive mock data"""
-    np.random.seed(year + month)
-    random.seed(year + month)
-    
-    client_count = 27
-    countries = ["India", "Mauritius", "Singapore", "UAE", "UK", "Panama", "Qatar", "China", "USA", "Switzerland"]
-    industries = ["Defence", "Material", "Co-operative", "Banking", "Trading", "Real Estate", "Financial Services", "IT Services"]
-    
-    # Create structured data based on report
-    client_data = []
-    
-    # High Risk: 11 clients (5 Defence + 6 Material)
-    for i in range(11):
-        subcat = "Defence" if i < 5 else "Material"
-        is_new = i < 5  # 5 new high risk clients
-        client_data.append({
-            "Risk_Category": "High",
-            "Subcategory": subcat,
-            "Is_New": is_new
-        })
-    
-    # Medium Risk: 11 clients (3 Co-operative + 8 Material)  
-    for i in range(11):
-        subcat = "Co-operative" if i < 3 else "Material"
-        is_new = i < 1  # 1 new medium risk
-        client_data.append({
-            "Risk_Category": "Medium",
-            "Subcategory": subcat,
-            "Is_New": is_new
-        })
-    
-    # Low Risk: 5 clients
-    for i in range(5):
-        client_data.append({
-            "Risk_Category": "Low",
-            "Subcategory": "Low Risk",
-            "Is_New": False
-        })
-    
-    # Generate DataFrame
-    base_date = datetime(year, month, 1)
-    data_rows = []
-    
-    for i, client_info in enumerate(client_data):
-        if client_info["Is_New"]:
-            days_back = random.randint(1, 30)
-        else:
-            if client_info["Risk_Category"] == "High":
-                days_back = random.randint(30, 365)
-            elif client_info["Risk_Category"] == "Medium":
-                days_back = random.randint(180, 1095)
-            else:
-                days_back = random.randint(365, 1825)
-        
-        review_date = base_date - timedelta(days=days_back)
-        
-        # Status assignment
-        if month == 5 and year == 2025 and i < 3:
-            status = random.choice(["NCC", "Suspended", "Withdrawn"])
-        else:
-            status = "Active"
-        
-        data_rows.append({
-            "Client_ID": f"C{str(i+1).zfill(3)}",
-            "Client_Name": f"Client_{i+1}",
-            "Country": np.random.choice(countries),
-            "Industry": client_info["Subcategory"],
-            "Risk_Category": client_info["Risk_Category"],
-            "Subcategory": client_info["Subcategory"],
-            "Last_Reviewed": review_date,
-            "Status": status,
-            "Is_New_Client": client_info["Is_New"],
-            "GST_PAN_Verified": random.choice([True, False]) if client_info["Is_New"] else True,
-            "Sanctions_Checked": True,
-            "Dow_Jones_Alert": False,
-            "Month": month,
-            "Year": year,
-            "Business_Vertical": random.choice(["Ratings", "Research", "Advisory", "Risk Solutions"]),
-            "AUM_Million_USD": random.randint(10, 500),
-            "Last_Transaction_Date": review_date + timedelta(days=random.randint(1, 30))
-        })
-    
-    df = pd.DataFrame(data_rows)
-    df["Next_Review"] = df.apply(
-        lambda row: calculate_next_review_date(row["Last_Reviewed"], row["Risk_Category"]), 
-        axis=1
-    )
-    
-    current_date = datetime.now()
-    df["Days_Until_Review"] = (df["Next_Review"] - current_date).dt.days
-    
-    return df
+api_server = start_metrics_api(int(API_PORT)) if API_PORT else None
+
+# ----------------- Static Assets -----------------
+ASSETS_DIR = Path(__file__).parent / "assets"
+
+@st.cache_resource
+def load_asset(name):
+    """Read a static CSS/HTML asset once per process"""
+    return (ASSETS_DIR / name).read_text(encoding="utf-8")
+
+st.markdown(f"<style>\n{load_asset('dashboard.css')}</style>", unsafe_allow_html=True)
+st.markdown(load_asset("header.html"), unsafe_allow_html=True)
 
 # ----------------- Load Data -----------------
-@st.cache_data
-def load_all_data():
-    data_may_2025 = generate_enhanced_mock_data(5, 2025)
-    data_apr_2025 = generate_enhanced_mock_data(4, 2025) 
-    data_may_2024 = generate_enhanced_mock_data(5, 2024)
-    return pd.concat([data_may_2025, data_apr_2025, data_may_2024])
+dataset = aml_data.load_dataset()
+all_data = dataset.frame
 
-all_data = load_all_data()
+# ----------------- Chart Payload Budget -----------------
+chart_payloads = {}
 
-# ----------------- Header -----------------
-st.markdown("""
-<div class="main-header">
-    <h1>🏢 CRISIL - AML Risk Management Dashboard</h1>
-    <h3>Executive Anti-Money Laundering Risk Assessment & Monitoring</h3>
-</div>
-""", unsafe_allow_html=True)
+def render_chart(fig, name):
+    """Render a Plotly figure, recording its serialized payload size when measurement is on"""
+    if measure_payloads:
+        chart_payloads[name] = len(fig.to_json().encode("utf-8"))
+    st.plotly_chart(fig, use_container_width=True)
 
 # ----------------- Sidebar -----------------
 with st.sidebar:
@@ -248,7 +94,7 @@ with st.sidebar:
     show_only_active = st.checkbox("Show Active Clients Only", value=True)
     
     # Quick Stats in Sidebar
-    current_data = all_data[(all_data["Year"] == selected_year) & (all_data["Month"] == selected_month)]
+    current_data = aml_data.period_rows(all_data, selected_year, selected_month, dataset.period_index)
     if show_only_active:
         current_data = current_data[current_data["Status"] == "Active"]
     
@@ -257,17 +103,19 @@ with st.sidebar:
     st.metric("Total Clients", len(current_data))
     st.metric("New This Month", len(current_data[current_data["Is_New_Client"] == True]))
     st.metric("High Risk", len(current_data[current_data["Risk_Category"] == "High"]))
+    
+    st.markdown("---")
+    # Serializing every figure just to size it doubles the work, so it is opt-in
+    measure_payloads = st.checkbox("📦 Measure chart payloads", value=False)
 
 # Filter data
-filtered_data = all_data[
-    (all_data["Year"] == selected_year) &
-    (all_data["Month"] == selected_month) &
-    (all_data["Country"].isin(selected_countries)) &
-    (all_data["Industry"].isin(selected_industries))
-]
-
-if show_only_active:
-    filtered_data = filtered_data[filtered_data["Status"] == "Active"]
+filtered_data = aml_data.filter_data(
+    all_data, selected_year, selected_month, selected_countries, selected_industries, show_only_active,
+    dataset.period_index
+)
+metrics = aml_data.compute_metrics(
+    selected_year, selected_month, selected_countries, selected_industries, show_only_active
+)
 
 # ----------------- Main Dashboard Tabs -----------------
 tab1, tab2 = st.tabs(["📊 Executive Summary", "📋 Detailed Analytics"])
@@ -280,13 +128,12 @@ with tab1:
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
-    total_clients = len(filtered_data)
-    new_clients = len(filtered_data[filtered_data["Is_New_Client"] == True])
-    high_risk = len(filtered_data[filtered_data["Risk_Category"] == "High"])
-    pending_reviews = len(filtered_data[filtered_data["Days_Until_Review"] <= 30])
-    ncc_clients = len(all_data[(all_data["Status"].isin(["NCC", "Suspended", "Withdrawn"])) & 
-                              (all_data["Year"] == selected_year) & 
-                              (all_data["Month"] == selected_month)])
+    kpis = metrics["kpis"]
+    total_clients = kpis["total_clients"]
+    new_clients = kpis["new_clients"]
+    high_risk = kpis["high_risk"]
+    pending_reviews = kpis["pending_reviews"]
+    ncc_clients = kpis["ncc_clients"]
     
     with col1:
         st.markdown(f"""
@@ -337,6 +184,7 @@ with tab1:
     with col1:
         # Risk Distribution Donut Chart
         risk_counts = filtered_data["Risk_Category"].value_counts()
+        risk_counts = risk_counts[risk_counts > 0]
         fig_risk = go.Figure(data=[go.Pie(
             labels=risk_counts.index, 
             values=risk_counts.values,
@@ -350,11 +198,11 @@ with tab1:
             showlegend=True,
             annotations=[dict(text=f'{total_clients}<br>Total', x=0.5, y=0.5, font_size=16, showarrow=False)]
         )
-        st.plotly_chart(fig_risk, use_container_width=True)
+        render_chart(fig_risk, "Risk Distribution")
     
     with col2:
         # New vs Existing Clients
-        new_vs_existing = filtered_data.groupby(['Risk_Category', 'Is_New_Client']).size().reset_index(name='Count')
+        new_vs_existing = filtered_data.groupby(['Risk_Category', 'Is_New_Client'], observed=True).size().reset_index(name='Count')
         new_vs_existing['Client_Type'] = new_vs_existing['Is_New_Client'].map({True: 'New', False: 'Existing'})
         
         fig_new_existing = px.bar(
@@ -366,11 +214,11 @@ with tab1:
             color_discrete_map={'New': '#17a2b8', 'Existing': '#6c757d'},
             height=300
         )
-        st.plotly_chart(fig_new_existing, use_container_width=True)
+        render_chart(fig_new_existing, "New vs Existing")
     
     with col3:
         # Geographic Distribution
-        country_counts = filtered_data["Country"].value_counts().head(8)
+        country_counts, other_countries = split_top_categories(filtered_data["Country"].value_counts())
         fig_geo = px.bar(
             x=country_counts.values,
             y=country_counts.index,
@@ -381,14 +229,16 @@ with tab1:
             height=300
         )
         fig_geo.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
-        st.plotly_chart(fig_geo, use_container_width=True)
+        render_chart(fig_geo, "Countries")
+        if other_countries:
+            st.caption(f"+{other_countries} clients in other countries")
     
     # Row 2: Business Intelligence Charts
     col4, col5, col6 = st.columns(3)
     
     with col4:
         # Industry Risk Heatmap
-        industry_risk = filtered_data.groupby(['Industry', 'Risk_Category']).size().unstack(fill_value=0)
+        industry_risk = cap_frame_rows(filtered_data.groupby(['Industry', 'Risk_Category'], observed=True).size().unstack(fill_value=0))
         fig_heatmap = px.imshow(
             industry_risk.values,
             x=industry_risk.columns,
@@ -397,7 +247,7 @@ with tab1:
             color_continuous_scale='RdYlGn_r',
             height=300
         )
-        st.plotly_chart(fig_heatmap, use_container_width=True)
+        render_chart(fig_heatmap, "Industry Heatmap")
     
     with col5:
         # Review Timeline - Next 6 Months
@@ -407,36 +257,34 @@ with tab1:
         upcoming_data = filtered_data[
             (filtered_data["Next_Review"] >= current_date) & 
             (filtered_data["Next_Review"] <= six_months)
-        ].copy()
+        ]
         
         if not upcoming_data.empty:
-            upcoming_data["Review_Month"] = upcoming_data["Next_Review"].dt.to_period("M")
-            reviews_timeline = upcoming_data.groupby(["Review_Month", "Risk_Category"]).size().reset_index(name="Count")
-            reviews_timeline["Review_Month"] = reviews_timeline["Review_Month"].astype(str)
+            reviews_timeline = bin_timeseries(upcoming_data, "Next_Review", "Risk_Category")
             
             fig_timeline = px.area(
                 reviews_timeline,
-                x="Review_Month",
+                x="Period",
                 y="Count", 
                 color="Risk_Category",
                 title="Upcoming Reviews (6 Months)",
                 color_discrete_map={'High': '#dc3545', 'Medium': '#ffc107', 'Low': '#28a745'},
                 height=300
             )
-            st.plotly_chart(fig_timeline, use_container_width=True)
+            render_chart(fig_timeline, "Review Timeline")
         else:
             st.info("No upcoming reviews in next 6 months")
     
     with col6:
         # Business Vertical Distribution
-        vertical_counts = filtered_data["Business_Vertical"].value_counts()
+        vertical_counts = cap_categories(filtered_data["Business_Vertical"].value_counts())
         fig_vertical = px.pie(
             values=vertical_counts.values,
             names=vertical_counts.index,
             title="Distribution by Business Vertical",
             height=300
         )
-        st.plotly_chart(fig_vertical, use_container_width=True)
+        render_chart(fig_vertical, "Business Vertical")
     
     # ----------------- Management Summary Report -----------------
     st.markdown("### 📋 Executive Management Summary")
@@ -450,7 +298,7 @@ with tab1:
         </div>
         """, unsafe_allow_html=True)
         
-        current_data = all_data[(all_data["Year"] == selected_year) & (all_data["Month"] == selected_month)]
+        current_data = aml_data.period_rows(all_data, selected_year, selected_month, dataset.period_index)
         new_clients_total = len(current_data[current_data["Is_New_Client"] == True])
         new_medium = len(current_data[(current_data["Is_New_Client"] == True) & (current_data["Risk_Category"] == "Medium")])
         new_low = len(current_data[(current_data["Is_New_Client"] == True) & (current_data["Risk_Category"] == "Low")])
@@ -489,22 +337,16 @@ with tab1:
         # Risk Summary Table
         st.markdown("#### 📊 Risk Distribution Table")
         
-        summary_data = []
-        for risk in ["High", "Medium", "Low"]:
-            risk_clients = current_data[current_data["Risk_Category"] == risk]
-            for subcat in risk_clients["Subcategory"].unique():
-                subcat_clients = risk_clients[risk_clients["Subcategory"] == subcat]
-                new_count = len(subcat_clients[subcat_clients["Is_New_Client"] == True])
-                existing_count = len(subcat_clients[subcat_clients["Is_New_Client"] == False])
-                summary_data.append({
-                    "Risk Category": risk,
-                    "Subcategory": subcat,
-                    "New": new_count,
-                    "Existing": existing_count,
-                    "Total": new_count + existing_count
-                })
-        
-        summary_df = pd.DataFrame(summary_data)
+        summary_df = pd.DataFrame(
+            metrics["risk_distribution"],
+            columns=["risk_category", "subcategory", "new", "existing", "total"]
+        ).rename(columns={
+            "risk_category": "Risk Category",
+            "subcategory": "Subcategory",
+            "new": "New",
+            "existing": "Existing",
+            "total": "Total"
+        })
         st.dataframe(summary_df, use_container_width=True, hide_index=True)
         
         # Total row
@@ -595,10 +437,11 @@ with tab2:
         # Review Status Summary
         col1, col2, col3, col4 = st.columns(4)
         
-        overdue = len(filtered_data[filtered_data["Days_Until_Review"] < 0])
-        due_soon = len(filtered_data[(filtered_data["Days_Until_Review"] >= 0) & (filtered_data["Days_Until_Review"] <= 30)])
-        due_later = len(filtered_data[(filtered_data["Days_Until_Review"] > 30) & (filtered_data["Days_Until_Review"] <= 90)])
-        scheduled = len(filtered_data[filtered_data["Days_Until_Review"] > 90])
+        buckets = metrics["review_buckets"]
+        overdue = buckets["overdue"]
+        due_soon = buckets["due_30_days"]
+        due_later = buckets["due_90_days"]
+        scheduled = buckets["scheduled"]
         
         with col1:
             st.metric("🔴 Overdue Reviews", overdue)
@@ -659,9 +502,11 @@ with tab2:
         
         with col1:
             # Risk Trend Analysis (if multiple periods available)
-            if len(all_data["Month"].unique()) > 1:
-                trend_data = all_data.groupby(["Year", "Month", "Risk_Category"]).size().reset_index(name="Count")
-                trend_data["Period"] = trend_data["Year"].astype(str) + "-" + trend_data["Month"].astype(str).str.zfill(2)
+            trend_counts = aml_data.risk_trend(dataset.version)
+            if trend_counts["Month"].nunique() > 1:
+                trend_data = bin_timeseries(
+                    trend_counts, "Snapshot_Date", "Risk_Category", snapshot=True, weight_col="Count"
+                )
                 
                 fig_trend = px.line(
                     trend_data,
@@ -671,11 +516,11 @@ with tab2:
                     title="Risk Category Trends Over Time",
                     color_discrete_map={'High': '#dc3545', 'Medium': '#ffc107', 'Low': '#28a745'}
                 )
-                st.plotly_chart(fig_trend, use_container_width=True)
+                render_chart(fig_trend, "Risk Trend")
         
         with col2:
             # Portfolio Composition by AUM
-            aum_risk = filtered_data.groupby("Risk_Category")["AUM_Million_USD"].sum().reset_index()
+            aum_risk = filtered_data.groupby("Risk_Category", observed=True)["AUM_Million_USD"].sum().reset_index()
             
             fig_aum = px.bar(
                 aum_risk,
@@ -686,14 +531,14 @@ with tab2:
                 color_discrete_map={'High': '#dc3545', 'Medium': '#ffc107', 'Low': '#28a745'}
             )
             fig_aum.update_layout(yaxis_title="AUM (Million USD)")
-            st.plotly_chart(fig_aum, use_container_width=True)
+            render_chart(fig_aum, "AUM by Risk")
         
         # Risk Correlation Matrix
         st.markdown("#### 🔗 Risk Correlation Analysis")
         
         # Create correlation data
         corr_data = filtered_data.copy()
-        corr_data['Risk_Score'] = corr_data['Risk_Category'].map({'Low': 1, 'Medium': 2, 'High': 3})
+        corr_data['Risk_Score'] = corr_data['Risk_Category'].map({'Low': 1, 'Medium': 2, 'High': 3}).astype(int)
         corr_data['Days_Overdue'] = corr_data['Days_Until_Review'].apply(lambda x: max(0, -x))
         corr_data['Is_High_AUM'] = (corr_data['AUM_Million_USD'] > corr_data['AUM_Million_USD'].median()).astype(int)
         
@@ -707,7 +552,7 @@ with tab2:
             color_continuous_scale="RdBu",
             aspect="auto"
         )
-        st.plotly_chart(fig_corr, use_container_width=True)
+        render_chart(fig_corr, "Correlation Matrix")
         
         # Summary Statistics Table
         st.markdown("#### 📈 Portfolio Summary Statistics")
@@ -729,6 +574,26 @@ with tab2:
         stats_df = pd.DataFrame(summary_stats)
         st.dataframe(stats_df, use_container_width=True, hide_index=True)
 
+# ----------------- Performance Report -----------------
+with st.sidebar:
+    st.markdown("---")
+    if measure_payloads:
+        with st.expander("📦 Chart Payloads"):
+            payload_df = pd.DataFrame(
+                {"Chart": list(chart_payloads), "Size (KB)": [round(size / 1024, 1) for size in chart_payloads.values()]}
+            )
+            st.dataframe(payload_df, use_container_width=True, hide_index=True)
+            st.caption(f"Total: {sum(chart_payloads.values()) / 1024:.1f} KB across {len(chart_payloads)} charts")
+            over_budget = payload_df[payload_df["Size (KB)"] > MAX_FIGURE_PAYLOAD_KB]
+            if not over_budget.empty:
+                st.warning(f"{len(over_budget)} chart(s) exceed the {MAX_FIGURE_PAYLOAD_KB} KB payload budget")
+    st.caption(f"Dataset version: {dataset.version}")
+    if API_PORT:
+        if api_server is None:
+            st.caption(f"Metrics API: port {API_PORT} is held by another process")
+        else:
+            st.caption(f"Metrics API: serving on port {API_PORT}")
+
 # ----------------- Footer -----------------
 st.markdown("---")
 st.markdown(f"""
@@ -0,0 +1,67 @@
+"""Payload budgets for dashboard charts: long-tail bucketing and time-series binning.
+
+Kept free of Streamlit so the helpers can be imported and tested on their own.
+"""
+import pandas as pd
+
+MAX_CATEGORIES_PER_CHART = 8
+MAX_HEATMAP_ROWS = 12
+MAX_TIMELINE_POINTS = 24
+MAX_FIGURE_PAYLOAD_KB = 64
+OTHER_LABEL = "Other"
+TIMELINE_RESOLUTIONS = ["M", "Q", "Y"]
+
+def split_top_categories(counts, limit=MAX_CATEGORIES_PER_CHART):
+    """Split counts into the `limit` largest non-zero categories and the total of the rest"""
+    # Snapshot string columns are categorical, whose value_counts also lists absent values
+    counts = counts[counts > 0].sort_values(ascending=False)
+    return counts.iloc[:limit], counts.iloc[limit:].sum()
+
+def cap_categories(counts, limit=MAX_CATEGORIES_PER_CHART):
+    """Keep the largest categories and bucket the long tail into 'Other', `limit` entries at most"""
+    head, tail_total = split_top_categories(counts, limit)
+    if tail_total == 0:
+        return head
+    head, tail_total = split_top_categories(counts, limit - 1)
+    return pd.concat([head, pd.Series({OTHER_LABEL: tail_total})])
+
+def cap_frame_rows(frame, limit=MAX_HEATMAP_ROWS):
+    """Keep the rows with the largest totals and sum the remaining rows into 'Other'"""
+    if len(frame) <= limit:
+        return frame
+    order = frame.sum(axis=1).sort_values(ascending=False).index
+    head = frame.loc[order[:limit - 1]]
+    tail = frame.loc[order[limit - 1:]].sum().rename(OTHER_LABEL)
+    return pd.concat([head, tail.to_frame().T])
+
+def bin_timeseries(df, date_col, group_col, max_points=MAX_TIMELINE_POINTS, snapshot=False, weight_col=None):
+    """Count rows (or sum `weight_col`) per period and group, coarsening the resolution to fit the point budget.
+
+    With snapshot=True every date is a point-in-time portfolio snapshot, so a coarse
+    period reports its latest snapshot instead of summing all of them. If even yearly
+    bins exceed the budget, older snapshots are dropped; otherwise the oldest periods
+    are folded into a single leading "≤ <period>" bucket.
+    """
+    for freq in TIMELINE_RESOLUTIONS:
+        periods = df[date_col].dt.to_period(freq)
+        if periods.nunique() <= max_points:
+            break
+    floor = None
+    if periods.nunique() > max_points:
+        floor = sorted(periods.unique())[-max_points]
+        if snapshot:
+            df, periods = df[periods >= floor], periods[periods >= floor]
+        else:
+            periods = periods.where(periods >= floor, floor)
+    if snapshot:
+        is_latest = df[date_col] == df[date_col].groupby(periods).transform("max")
+        df, periods = df[is_latest], periods[is_latest]
+    grouped = df.groupby([periods.rename("Period"), group_col], observed=True)
+    if weight_col is None:
+        binned = grouped.size().reset_index(name="Count")
+    else:
+        binned = grouped[weight_col].sum().reset_index(name="Count")
+    binned["Period"] = binned["Period"].astype(str)
+    if floor is not None and not snapshot:
+        binned["Period"] = binned["Period"].replace(str(floor), f"≤ {floor}")
+    return binned
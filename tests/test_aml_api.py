@@ -0,0 +1,133 @@
+import asyncio
+import json
+import socket
+
+import pytest
+
+import aml_api
+import aml_data
+
+
+def request(path, query=b"", method="GET", headers=()):
+    """Drive the ASGI app directly and return (status, headers, body)"""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query, "headers": list(headers)}
+    asyncio.run(aml_api.app(scope, receive, send))
+    start, body = messages
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+def test_health():
+    status, _, body = request("/health")
+    assert status == 200
+    assert json.loads(body) == {"status": "ok"}
+
+
+def test_periods_match_dataset():
+    status, _, body = request("/periods")
+    assert status == 200
+    periods = [(p["year"], p["month"]) for p in json.loads(body)["periods"]]
+    assert periods == list(aml_data.available_periods())
+
+
+def test_metrics_match_aggregation_layer():
+    status, headers, body = request("/metrics", b"year=2025&month=5&countries=India,UK&active_only=false")
+    assert status == 200
+    assert headers[b"content-type"] == b"application/json"
+    payload = json.loads(body)
+    expected = aml_data.compute_metrics(2025, 5, countries=["India", "UK"], active_only=False)
+    assert payload == json.loads(json.dumps(expected))
+    assert payload["filters"]["countries"] == ["India", "UK"]
+    assert payload["filters"]["active_only"] is False
+
+
+def test_metrics_defaults_to_all_filters_and_active_only():
+    _, _, body = request("/metrics", b"year=2025&month=5")
+    payload = json.loads(body)
+    summary = aml_data.dataset_summary(aml_data.data_version())
+    assert payload["filters"]["countries"] == list(summary.countries)
+    assert payload["filters"]["industries"] == list(summary.industries)
+    assert payload["filters"]["active_only"] is True
+
+
+def test_matching_etag_returns_not_modified():
+    _, headers, _ = request("/metrics", b"year=2025&month=5")
+    etag = headers[b"etag"]
+    status, _, body = request("/metrics", b"year=2025&month=5", headers=[(b"if-none-match", etag)])
+    assert status == 304
+    assert body == b""
+    status, _, _ = request("/metrics", b"year=2025&month=5", headers=[(b"if-none-match", b'"stale"')])
+    assert status == 200
+
+
+def test_etag_depends_on_filters():
+    _, all_headers, _ = request("/metrics", b"year=2025&month=5")
+    _, india_headers, _ = request("/metrics", b"year=2025&month=5&countries=India")
+    assert all_headers[b"etag"] != india_headers[b"etag"]
+
+
+def test_head_sends_headers_only():
+    status, headers, body = request("/metrics", b"year=2025&month=5", method="HEAD")
+    assert status == 200
+    assert body == b""
+    assert int(headers[b"content-length"]) > 0
+
+
+@pytest.mark.parametrize("query, message", [
+    (b"month=5", "missing required parameter 'year'"),
+    (b"year=2025", "missing required parameter 'month'"),
+    (b"year=abc&month=5", "parameter 'year' must be an integer"),
+    (b"year=2025&month=5&active_only=maybe", "parameter 'active_only' must be a boolean"),
+])
+def test_bad_parameters_return_400(query, message):
+    status, _, body = request("/metrics", query)
+    assert status == 400
+    assert json.loads(body) == {"error": message}
+
+
+def test_unknown_period_returns_404():
+    status, _, body = request("/metrics", b"year=1999&month=1")
+    assert status == 404
+    assert json.loads(body) == {"error": "no data for the requested period"}
+
+
+def test_unknown_path_returns_404():
+    status, _, _ = request("/nope")
+    assert status == 404
+
+
+def test_non_get_returns_405():
+    status, _, _ = request("/metrics", b"year=2025&month=5", method="POST")
+    assert status == 405
+
+
+def test_serve_in_background_skips_a_port_already_bound():
+    pytest.importorskip("uvicorn")
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as holder:
+        holder.bind(("127.0.0.1", 0))
+        holder.listen()
+        assert aml_api.serve_in_background(holder.getsockname()[1], host="127.0.0.1") is None
+
+
+def test_only_one_of_two_racing_binds_serves():
+    pytest.importorskip("uvicorn")
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as racer:
+        # A second worker that has bound the port but not reached listen() yet
+        racer.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        racer.bind(("127.0.0.1", 0))
+        port = racer.getsockname()[1]
+        server = aml_api.serve_in_background(port, host="127.0.0.1")
+        try:
+            assert server is not None
+            with pytest.raises(OSError):
+                racer.listen()
+            assert aml_api.serve_in_background(port, host="127.0.0.1") is None
+        finally:
+            server.should_exit = True
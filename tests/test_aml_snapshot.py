@@ -0,0 +1,109 @@
+import mmap
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import aml_data
+import aml_snapshot
+
+
+def is_memory_mapped(array):
+    while array is not None:
+        if isinstance(array, mmap.mmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+@pytest.fixture
+def snapshot_root(tmp_path, monkeypatch):
+    aml_snapshot.write_snapshot(aml_data.build_all_data(), tmp_path)
+    monkeypatch.setattr(aml_data, "SNAPSHOT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_every_stored_column_is_memory_mapped(snapshot_root):
+    frame = aml_snapshot.load_snapshot(snapshot_root).frame
+    for name in frame.columns:
+        if isinstance(frame[name].dtype, pd.CategoricalDtype):
+            values = frame[name].array.codes
+        else:
+            values = frame[name].to_numpy()
+        assert is_memory_mapped(values), name
+
+
+def test_string_columns_load_as_categoricals_that_filter_like_strings(snapshot_root):
+    frame = aml_data.load_all_data()
+    assert isinstance(frame["Country"].dtype, pd.CategoricalDtype)
+    generated = aml_data.build_all_data()
+    assert frame["Client_Name"].str.contains("client_1", case=False).sum() == \
+        generated["Client_Name"].str.contains("client_1", case=False).sum()
+    assert frame["Country"].isin(["India", "UK"]).sum() == generated["Country"].isin(["India", "UK"]).sum()
+
+
+def test_period_index_matches_period_filter(snapshot_root):
+    dataset = aml_data.load_dataset()
+    frame = dataset.frame
+    for year, month in aml_data.available_periods():
+        indexed = aml_data.period_rows(frame, year, month, dataset.period_index)
+        scanned = aml_data.period_rows(frame, year, month)
+        assert indexed.index.tolist() == scanned.index.tolist()
+        assert set(zip(indexed["Year"], indexed["Month"])) == {(year, month)}
+
+
+def test_snapshot_metrics_match_generated_metrics(snapshot_root, monkeypatch):
+    from_snapshot = aml_data.compute_metrics(2025, 5, countries=["India", "UAE"], active_only=False)
+    monkeypatch.setattr(aml_data, "SNAPSHOT_DIR", None)
+    generated = aml_data.compute_metrics(2025, 5, countries=["India", "UAE"], active_only=False)
+    strip = lambda metrics: {key: value for key, value in metrics.items() if key != "data_version"}
+    assert strip(from_snapshot) == strip(generated)
+
+
+def test_publishing_a_new_version_swaps_readers_over(snapshot_root):
+    before = aml_data.compute_metrics(2025, 5)["data_version"]
+    after_version = aml_snapshot.write_snapshot(aml_data.build_all_data(), snapshot_root)
+    assert after_version != before
+    assert aml_data.compute_metrics(2025, 5)["data_version"] == after_version
+
+
+def test_prune_keeps_the_newest_versions(snapshot_root):
+    for _ in range(3):
+        aml_snapshot.write_snapshot(aml_data.build_all_data(), snapshot_root, keep=2)
+    versions = sorted(path.name for path in snapshot_root.iterdir() if path.is_dir())
+    assert len(versions) == 2
+    assert versions[-1] == aml_snapshot.current_version(snapshot_root)
+
+
+def test_days_until_review_is_rederived_each_day(snapshot_root, monkeypatch):
+    class FakeDate(date):
+        current = date(2026, 1, 1)
+
+        @classmethod
+        def today(cls):
+            return cls.current
+
+    monkeypatch.setattr(aml_data, "date", FakeDate)
+    first = aml_data.load_all_data()
+    assert aml_data.compute_metrics(2025, 5)["as_of"] == "2026-01-01"
+    assert aml_data.load_all_data() is first
+
+    FakeDate.current = date(2026, 1, 2)
+    assert aml_data.load_all_data() is not first
+    assert aml_data.compute_metrics(2025, 5)["as_of"] == "2026-01-02"
+
+
+def test_failed_write_removes_its_staging_directory(tmp_path, monkeypatch):
+    def fail_midway(df, directory, version):
+        (directory / "partial.npy").write_bytes(b"")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(aml_snapshot, "_write_version", fail_midway)
+    with pytest.raises(OSError, match="disk full"):
+        aml_snapshot.write_snapshot(aml_data.build_all_data(), tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_missing_snapshot_explains_how_to_build_one(tmp_path):
+    with pytest.raises(FileNotFoundError, match="aml_snapshot.py build"):
+        aml_snapshot.current_version(tmp_path)
@@ -0,0 +1,89 @@
+import pandas as pd
+
+from chart_budget import OTHER_LABEL, bin_timeseries, cap_categories, cap_frame_rows, split_top_categories
+
+
+def counts_of(n):
+    return pd.Series({f"c{i}": n - i for i in range(n)})
+
+
+def test_split_top_categories_keeps_limit_and_totals_the_rest():
+    head, tail_total = split_top_categories(counts_of(10), limit=8)
+    assert list(head.index) == [f"c{i}" for i in range(8)]
+    assert tail_total == 2 + 1
+
+
+def test_cap_categories_buckets_long_tail_into_other():
+    capped = cap_categories(counts_of(10), limit=8)
+    assert len(capped) == 8
+    assert capped.index[-1] == OTHER_LABEL
+    assert capped[OTHER_LABEL] == 3 + 2 + 1
+    assert capped.sum() == counts_of(10).sum()
+
+
+def test_cap_categories_leaves_short_series_alone():
+    capped = cap_categories(counts_of(8), limit=8)
+    assert OTHER_LABEL not in capped.index
+    assert len(capped) == 8
+
+
+def test_zero_count_categorical_values_are_dropped():
+    values = pd.Series(pd.Categorical(["a", "a", "b"], categories=["a", "b", "unused"]))
+    counts = values.value_counts()
+    assert counts["unused"] == 0
+    assert "unused" not in cap_categories(counts).index
+    head, tail_total = split_top_categories(counts, limit=1)
+    assert list(head.index) == ["a"]
+    assert tail_total == 1
+
+
+def test_cap_frame_rows_sums_smallest_rows_into_other():
+    frame = pd.DataFrame({"High": [5, 4, 1, 1], "Low": [0, 1, 1, 0]}, index=["a", "b", "c", "d"])
+    capped = cap_frame_rows(frame, limit=3)
+    assert list(capped.index) == ["a", "b", OTHER_LABEL]
+    assert capped.loc[OTHER_LABEL].tolist() == [2, 1]
+
+
+def test_bin_timeseries_coarsens_until_within_budget():
+    df = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=36, freq="MS"), "group": "g"})
+    binned = bin_timeseries(df, "date", "group", max_points=12)
+    assert binned["Period"].tolist() == [f"{year}Q{q}" for year in (2020, 2021, 2022) for q in (1, 2, 3, 4)]
+    assert binned["Count"].tolist() == [3] * 12
+
+
+def test_bin_timeseries_folds_oldest_periods_when_years_overflow():
+    df = pd.DataFrame({"date": pd.date_range("1990-01-01", periods=400, freq="MS"), "group": "g"})
+    binned = bin_timeseries(df, "date", "group")
+    assert len(binned) == 24
+    assert binned["Period"].iloc[0] == "≤ 2000"
+    assert binned["Count"].iloc[0] == 11 * 12
+    assert binned["Count"].sum() == 400
+
+
+def test_bin_timeseries_snapshot_keeps_latest_snapshot_per_period():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-01", "2024-01-01", "2024-02-01", "2024-03-01"]),
+        "group": ["a", "b", "a", "a"],
+    })
+    binned = bin_timeseries(df, "date", "group", max_points=1, snapshot=True)
+    assert binned.to_dict("records") == [{"Period": "2024Q1", "group": "a", "Count": 1}]
+
+
+def test_bin_timeseries_snapshot_drops_oldest_when_years_overflow():
+    df = pd.DataFrame({"date": pd.date_range("1990-01-01", periods=30, freq="YS"), "group": "g"})
+    binned = bin_timeseries(df, "date", "group", max_points=24, snapshot=True)
+    assert binned["Period"].tolist() == [str(year) for year in range(1996, 2020)]
+
+
+def test_bin_timeseries_sums_weights_of_preaggregated_rows():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-01", "2024-01-01", "2024-02-01"]),
+        "group": ["a", "b", "a"],
+        "Count": [5, 3, 7],
+    })
+    binned = bin_timeseries(df, "date", "group", snapshot=True, weight_col="Count")
+    assert binned.to_dict("records") == [
+        {"Period": "2024-01", "group": "a", "Count": 5},
+        {"Period": "2024-01", "group": "b", "Count": 3},
+        {"Period": "2024-02", "group": "a", "Count": 7},
+    ]
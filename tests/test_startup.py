@@ -0,0 +1,49 @@
+"""Import-time budget for replica cold starts.
+
+Each check runs its imports in a fresh interpreter, which is what a newly scheduled
+replica pays before it can serve. Use `python -X importtime -c "import aml_data"`
+to see where the time goes when a budget is exceeded.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Everything appv9.py imports eagerly before the first page renders
+IMPORT_TIME_BUDGET_SECONDS = 0.75
+# The headless API process must come up faster still
+HEADLESS_IMPORT_BUDGET_SECONDS = 0.5
+
+
+def measure_import(statement):
+    """Seconds spent executing an import statement in a fresh interpreter, plus its module names"""
+    script = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        f"{statement}\n"
+        "print(time.perf_counter() - started)\n"
+        "print(','.join(sorted(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    seconds, modules = result.stdout.strip().splitlines()
+    return float(seconds), set(modules.split(","))
+
+
+def test_dashboard_eager_imports_fit_budget():
+    pytest.importorskip("streamlit")
+    seconds, modules = measure_import("import streamlit, pandas, plotly.graph_objects, aml_data, chart_budget")
+    # Streamlit pulls in plotly.graph_objects itself; plotly.express is what appv9 defers
+    assert "plotly.express" not in modules
+    assert seconds < IMPORT_TIME_BUDGET_SECONDS, f"eager imports took {seconds:.3f}s"
+
+
+def test_headless_imports_skip_streamlit_and_plotly():
+    seconds, modules = measure_import("import aml_data, aml_api")
+    assert "streamlit" not in modules
+    assert "plotly" not in modules
+    assert seconds < HEADLESS_IMPORT_BUDGET_SECONDS, f"headless imports took {seconds:.3f}s"